@@ -1,9 +1,15 @@
 import argparse
 import os
+import subprocess
+import sys
 
 import seasonality as ssn
 
 
+# render without any GUI backend, plots are written to files only
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+
 # select the symbol to analyze
 
 # symbol = '2B7K.DE'    # iShares MSCI World SRI UCITS ETF EUR (Acc)
@@ -42,6 +48,7 @@ parser.add_argument('-s', '--symbol', type=str, default=symbol, help=f'Ticker sy
 parser.add_argument('-y', '--years', type=int, default=max_num_of_years, help=f'Maximum number of years to analyze backwards (default: {max_num_of_years} years)')
 parser.add_argument('-v', '--view', type=view_type, default=ssn.Views.CONSOLE, help='View to render the results (''console'' or ''pdf'', default: console)')
 parser.add_argument('-f', '--file', type=str, default='', help='File name to save the results (optional for console view)')
+parser.add_argument('-fs', '--fast_stl', action='store_true', help='Interpolate the STL smoothings for a much faster but slightly less exact decomposition')
 parser.add_argument('-a', '--ann_conf_band', action='store_true', help='Enable confidence bands to annual plots (time consuming, only for pdf view)')
 parser.add_argument('-nop', '--no_overall_daily_prices_plot', action='store_true', help='Disable overall daily prices plot in pdf view')
 parser.add_argument('-not', '--no_overall_daily_trend_plot', action='store_true', help='Disable overall daily trend plot in pdf view')
@@ -57,26 +64,42 @@ parser.add_argument('-pw', '--page_width', type=int, default=210, help='Page wid
 parser.add_argument('-ph', '--page_height', type=int, default=297, help='Page height in mm for pdf view (default: 297)')
 
 
-analyzer = ssn.Analyzer(parser.parse_args().symbol, parser.parse_args().years)
-analyzer.calc()
-
-analyzer.render(
-    parser.parse_args().view,
-    parser.parse_args().file,
-    ann_conf_band=parser.parse_args().ann_conf_band,
-    no_overall_daily_prices_plot=parser.parse_args().no_overall_daily_prices_plot,
-    no_overall_daily_trend_plot=parser.parse_args().no_overall_daily_trend_plot,
-    no_overall_daily_residual_plot=parser.parse_args().no_overall_daily_residual_plot,
-    no_annual_daily_prices_plot=parser.parse_args().no_annual_daily_prices_plot,
-    no_annual_daily_seasonal_plot=parser.parse_args().no_annual_daily_seasonal_plot,
-    no_annual_daily_redisdual_plot=parser.parse_args().no_annual_daily_redisdual_plot,
-    no_annual_weekly_seasonal_plot=parser.parse_args().no_annual_weekly_seasonal_plot,
-    no_annual_monthly_seasonal_plot=parser.parse_args().no_annual_monthly_seasonal_plot,
-    no_annual_quarterly_seasonal_plot=parser.parse_args().no_annual_quarterly_seasonal_plot,
-    no_weekdaily_seasonal_plot=parser.parse_args().no_weekdaily_seasonal_plot,
-    page_width=parser.parse_args().page_width,
-    page_height=parser.parse_args().page_height
-)
-
-if parser.parse_args().file != '':
-    os.system(f'open {parser.parse_args().file}')
+def main():
+    """Analyzes the symbol given on the command line and renders the results."""
+    args = parser.parse_args()
+
+    analyzer = ssn.Analyzer(args.symbol, args.years, fast_stl=args.fast_stl)
+    analyzer.calc()
+
+    analyzer.render(
+        args.view,
+        args.file,
+        ann_conf_band=args.ann_conf_band,
+        no_overall_daily_prices_plot=args.no_overall_daily_prices_plot,
+        no_overall_daily_trend_plot=args.no_overall_daily_trend_plot,
+        no_overall_daily_residual_plot=args.no_overall_daily_residual_plot,
+        no_annual_daily_prices_plot=args.no_annual_daily_prices_plot,
+        no_annual_daily_seasonal_plot=args.no_annual_daily_seasonal_plot,
+        no_annual_daily_redisdual_plot=args.no_annual_daily_redisdual_plot,
+        no_annual_weekly_seasonal_plot=args.no_annual_weekly_seasonal_plot,
+        no_annual_monthly_seasonal_plot=args.no_annual_monthly_seasonal_plot,
+        no_annual_quarterly_seasonal_plot=args.no_annual_quarterly_seasonal_plot,
+        no_weekdaily_seasonal_plot=args.no_weekdaily_seasonal_plot,
+        page_width=args.page_width,
+        page_height=args.page_height
+    )
+
+    # open the results with the default viewer of the platform without waiting for it
+    if args.file != '':
+        try:
+            if sys.platform == 'win32':
+                os.startfile(args.file)
+            else:
+                subprocess.Popen(['open' if sys.platform == 'darwin' else 'xdg-open', args.file], start_new_session=True)
+        except OSError:
+            # e.g. headless systems without a viewer, the results are saved anyway
+            print(f'Could not open {args.file}, no viewer available', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,16 @@
 from .model import Model
-from .views.pdfView import PdfView
 from .views.consoleView import ConsoleView
 from .views.view import Views
 
 
 class Analyzer:
 
-    def __init__(self, symbol: str, max_num_of_years: int) -> None:
+    def __init__(self, symbol: str, max_num_of_years: int, fast_stl: bool = False) -> None:
         """
         Creates an Analyzer object for the given symbol and maximum number of years to analyze.
+        With fast_stl, the STL decomposition interpolates its smoothings for a much faster but slightly less exact fit.
         """
-        self.__model = Model(symbol, max_num_of_years)
+        self.__model = Model(symbol, max_num_of_years, fast_stl=fast_stl)
 
     def calc(self) -> None:
         """
@@ -40,6 +40,9 @@ class Analyzer:
         Renders the seasonality for the given symbol and maximum number of years to analyze.
         """
         if view == Views.PDF:
+            # imported on demand only, matplotlib and seaborn take about a second to load
+            from .views.pdfView import PdfView
+
             conf_band = ("ci", 95) if ann_conf_band else None
             self.__view = PdfView(
                 self.__model,
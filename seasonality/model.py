@@ -8,17 +8,19 @@ Classes:
 """
 
 import os
+import calendar
 import datetime as dt
+import hashlib
+import json
 import pickle
 
 
+import numpy as np
 import pandas as pd
-from pandas_datareader import data as pdr
+from pandas.tseries.frequencies import to_offset
 
 import yfinance as yf
 
-from statsmodels.tsa.seasonal import STL
-
 import requests
 from requests_cache import CacheMixin, SQLiteCache
 from requests_ratelimiter import LimiterMixin, MemoryQueueBucket
@@ -29,6 +31,95 @@ class CachedLimiterSession(CacheMixin, LimiterMixin, requests.Session):
     pass
 
 
+# Directory of all downloads and cache files
+_DOWNLOADS_DIRNAME = '.downloads'
+
+
+# Rate limited and cached sessions already created in this process, keyed by cache file name
+_sessions = {}
+
+
+def _get_session(cache_filename: str) -> CachedLimiterSession:
+    """Returns the memoized session using the given cache file or creates a new one."""
+    if cache_filename not in _sessions:
+        _sessions[cache_filename] = CachedLimiterSession(
+            limiter=Limiter(RequestRate(2, Duration.SECOND * 5),
+                            bucket_class=MemoryQueueBucket),
+            backend=SQLiteCache(cache_filename),
+        )
+    return _sessions[cache_filename]
+
+
+# Ticker objects already created in this process, keyed by symbol
+_tickers = {}
+
+
+def _get_ticker(symbol: str, session: requests.Session) -> yf.Ticker:
+    """Returns the memoized Ticker object of the given symbol or creates a new one."""
+    if symbol not in _tickers:
+        _tickers[symbol] = yf.Ticker(symbol, session=session)
+    return _tickers[symbol]
+
+
+def _stl_decompose_cached(close: pd.Series, cache_prefix: str, **stl_args) -> pd.DataFrame:
+    """Decomposes the given series via STL or loads the result of an identical previous decomposition.
+
+    The result is stored as pickle file named after the given prefix and a hash over
+    the values and dates of the series and the STL arguments. A rerun on unchanged data
+    therefore skips the LOESS fitting entirely.
+
+    Parameters:
+    -----------
+        close: pd.Series
+        Series to decompose
+
+        cache_prefix: str
+        Path and file name prefix of the cache file
+
+        stl_args:
+        Arguments passed to the `STL` constructor
+
+    Returns:
+    --------
+        Dataframe with the columns 'seasonal', 'trend' and 'resid'
+    """
+    key = hashlib.sha1(close.to_numpy().tobytes())
+    key.update(close.index.asi8.tobytes())
+    key.update(repr(sorted(stl_args.items())).encode())
+    cache_filename = f'{cache_prefix}_{key.hexdigest()}.pkl'
+
+    if os.path.isfile(cache_filename):
+        return pd.read_pickle(cache_filename)
+
+    # imported on cache miss only, statsmodels takes a noticeable time to load
+    from statsmodels.tsa.seasonal import STL
+
+    decompose_result = STL(close, **stl_args).fit()
+    decomp_df = pd.DataFrame({'seasonal': decompose_result.seasonal, 'trend': decompose_result.trend, 'resid': decompose_result.resid})
+    decomp_df.to_pickle(cache_filename)
+    return decomp_df
+
+
+# Lookup tables of the labels of the subcycle forms, indexed by the respective date fields
+_DAY_LABELS = np.array([f'{month:02d}-{day:02d}' for month in range(1, 13) for day in range(1, 32)], dtype=object)
+_WEEK_LABELS = np.array([f'{week:02d}' for week in range(54)], dtype=object)
+_MONTH_LABELS = np.array(calendar.month_abbr, dtype=object)
+_WEEKDAY_LABELS = np.array(calendar.day_abbr, dtype=object)
+
+
+def _format_dates(index: pd.DatetimeIndex, format: str) -> np.ndarray:
+    """Formats the dates like `index.strftime(format)`, via label lookups for the formats of the subcycle forms."""
+    if format == '%m-%d':
+        return _DAY_LABELS[(index.month - 1) * 31 + index.day - 1]
+    if format == '%V':
+        return _WEEK_LABELS[index.isocalendar().week.to_numpy(dtype=int)]
+    if format == '%b':
+        return _MONTH_LABELS[index.month]
+    if format == '%a':
+        return _WEEKDAY_LABELS[index.dayofweek]
+    return index.strftime(format).to_numpy()
+
+
 # Prepare new dataframe in subcycle form for annual data distribution
 def _df_to_subcycle_form(
         input_df: pd.DataFrame,
@@ -73,29 +164,23 @@ def _df_to_subcycle_form(
         Should leap days be dropped (default is True)
     """
 
-    # Create new dataframe
-    subcycleDf = pd.DataFrame(data=input_df)
-
-    # set correct frequency for better comparison
-    subcycleDf = subcycleDf.asfreq(freq)
+    # set correct frequency for better comparison, regenerating business days is slow so skip it if already set
+    subcycleDf = input_df if input_df.index.freq == to_offset(freq) else input_df.asfreq(freq)
 
     # fill up missing values for better comparison
     subcycleDf = subcycleDf.ffill() if with_fill else subcycleDf
 
+    # crop dataframe to last full years before deriving any per-year columns
+    subcycleDf = subcycleDf[range.min():range.max()]
+
     # Drop Feb. 29th of leap years for better comparison
     subcycleDf = subcycleDf[~((subcycleDf.index.month == 2) & (subcycleDf.index.day == 29))] if drop_leap else subcycleDf
 
     # Create year and month columns
-    subcycleDf['Year'], subcycleDf[col_name] = subcycleDf.index.year, subcycleDf.index.strftime(col_content)
-
-    # crop dataframe to last full years
-    subcycleDf = subcycleDf[range.min():range.max()]
+    subcycleDf = subcycleDf.assign(**{'Year': subcycleDf.index.year, col_name: _format_dates(subcycleDf.index, col_content)})
 
     # remove date index and return to numbered index
-    subcycleDf = subcycleDf.reset_index()
-
-    # remove date column which was left over from removing date index
-    subcycleDf = subcycleDf.drop('Date', axis=1)
+    subcycleDf = subcycleDf.reset_index(drop=True)
 
     return subcycleDf
 
@@ -124,7 +209,7 @@ class Model:
         Number of years from range_max_yrs
     """
 
-    def __init__(self, symbol: str, years: dt.datetime, robust: bool = False, annual_rolling_days: int = 30):
+    def __init__(self, symbol: str, years: dt.datetime, robust: bool = False, annual_rolling_days: int = 30, fast_stl: bool = False):
         """Constructor
 
         Parameters:
@@ -140,102 +225,148 @@ class Model:
 
             annual_rolling_days: int, optional
             Number of days for integrated rolling mean for annual daily subcycle form data
+
+            fast_stl: bool, optional
+            Fit the trend and low pass LOESS smoothings of the STL at every tenth of their windows only and interpolate in between, the seasonal smoothing stays exact (default is every day)
         """
         self.symbol = symbol
         self.years = years
         self.robust = robust
         self.annual_rolling_days = annual_rolling_days
+        self.fast_stl = fast_stl
         self._overall_daily_prices = pd.DataFrame()
         self._overall_daily_seasonal = pd.DataFrame()
         self._overall_daily_trend = pd.DataFrame()
         self._overall_daily_residual = pd.DataFrame()
         self._annual_daily_prices = pd.DataFrame()
+        self._info = None
+        self._info_filename = f'{_DOWNLOADS_DIRNAME}{os.path.sep}{self.symbol}_{dt.date.today()}.json'
+        self._http_cache_filename = f"{_DOWNLOADS_DIRNAME}{os.path.sep}yfinance.cache"
+        self._cache = {}
 
     def calc(self):
         """Performs the calculation to fill all the attributes."""
-        dirname = '.downloads'
-        history_filename = f'{dirname}{os.path.sep}{self.symbol}_{dt.date.today()}.csv'
-        cache_filename = f"{dirname}{os.path.sep}yfinance.cache"
-        pickle_filename = f"{dirname}{os.path.sep}lastAnalysis.pkl"
+        history_filename = f'{_DOWNLOADS_DIRNAME}{os.path.sep}{self.symbol}_{dt.date.today()}.csv'
+        prices_filename = f'{_DOWNLOADS_DIRNAME}{os.path.sep}{self.symbol}_{dt.date.today()}.pkl'
+        pickle_filename = f"{_DOWNLOADS_DIRNAME}{os.path.sep}lastAnalysis.pkl"
 
-        os.makedirs(dirname, exist_ok=True)
+        os.makedirs(_DOWNLOADS_DIRNAME, exist_ok=True)
 
-        session = CachedLimiterSession(
-            limiter=Limiter(RequestRate(2, Duration.SECOND * 5),
-                            bucket_class=MemoryQueueBucket),
-            backend=SQLiteCache(cache_filename),
-        )
-        self._ticker = yf.Ticker(self.symbol, session=session)
+        # symbol information is refreshed once per calc(), from the cache file of the current day
+        self._info = None
+        self._info_filename = f'{_DOWNLOADS_DIRNAME}{os.path.sep}{self.symbol}_{dt.date.today()}.json'
+        self._cache = {}
 
-        if not os.path.isfile(history_filename):
-            yf.pdr_override()  # <== that's all it takes :-)
-            self._overall_daily_prices = pdr.get_data_yahoo(tickers=[self.symbol], interval="1d")
-            self._overall_daily_prices.to_csv(history_filename)
+        # the csv file keeps the full download for backtrader, the pickle file the prepared closing prices for fast reruns
+        if os.path.isfile(prices_filename):
+            self._overall_daily_prices = pd.read_pickle(prices_filename)
         else:
-            self._overall_daily_prices = pd.read_csv(history_filename, parse_dates=['Date'], index_col=['Date'])
+            if not os.path.isfile(history_filename):
+                self._overall_daily_prices = yf.download(tickers=[self.symbol], interval="1d")
+                self._overall_daily_prices.to_csv(history_filename)
+            else:
+                self._overall_daily_prices = pd.read_csv(history_filename, parse_dates=['Date'], index_col=['Date'])
 
-        self._overall_daily_prices = self._overall_daily_prices[['Close']]
+            # single precision is plenty for prices and halves the memory of all derived price frames
+            self._overall_daily_prices = self._overall_daily_prices[['Close']].astype('float32')
 
-        # for (k, v) in self._ticker.info.items():
-        #     print(f'* {k}: {v}')
+            # set correct frequency
+            self._overall_daily_prices = self._overall_daily_prices.asfreq('B')
 
-        # set correct frequency
-        self._overall_daily_prices = self._overall_daily_prices.asfreq('B')
+            # fill up missing values
+            self._overall_daily_prices = self._overall_daily_prices.ffill()
 
-        # fill up missing values
-        self._overall_daily_prices = self._overall_daily_prices.ffill()
+            self._overall_daily_prices.to_pickle(prices_filename)
+
+        # for (k, v) in self._get_info().items():
+        #     print(f'* {k}: {v}')
 
         # prepare range of max 5 years or smaller if dataframe is smaller
-        first_day = pd.to_datetime(str((self._overall_daily_prices.index.year.min() + 1 if ((self._overall_daily_prices.index.year.max() - 1) - (self._overall_daily_prices.index.year.min() + 1)) < self.years else self._overall_daily_prices.index.year.max() - self.years)) + '-01-01')
-        last_day = pd.to_datetime(str(self._overall_daily_prices.index.year.max() - 1) + '-12-31')
-        self.range_max_yrs = pd.date_range(first_day, last_day, freq='D')
+        years = self._overall_daily_prices.index.year
+        min_year, max_year = years.min(), years.max()
+        first_year, last_year = (min_year + 1 if ((max_year - 1) - (min_year + 1)) < self.years else max_year - self.years), max_year - 1
+        self.range_max_yrs = pd.date_range(pd.Timestamp(first_year, 1, 1), pd.Timestamp(last_year, 12, 31), freq='D')
 
         # get actual number of calculated years for dataframe
-        self.range_num_of_years = self.range_max_yrs.max().year - self.range_max_yrs.min().year + 1
+        self.range_num_of_years = int(last_year - first_year + 1)
 
         # save information for backtrader
         backtest_info = {
             'history_filename': history_filename,
             'self.range_max_yrs': self.range_max_yrs,
         }
-        pickle.dump(backtest_info, open(pickle_filename, 'wb'))
+        with open(pickle_filename, 'wb') as f:
+            pickle.dump(backtest_info, f, protocol=pickle.HIGHEST_PROTOCOL)
 
         self._annual_daily_prices = _df_to_subcycle_form(self._overall_daily_prices, self.range_max_yrs)
 
         # set to multiindex: 1st level 'Day', 2nd level 'Year'
         self._annual_daily_prices = self._annual_daily_prices.set_index(['Year', 'Day'])
 
-        # reorder by index level 'Day'
-        self._annual_daily_prices = self._annual_daily_prices.sort_index(level='Year')
+        # reorder by index level 'Day', rows are in date order already unless the input was not sorted
+        if not self._annual_daily_prices.index.is_monotonic_increasing:
+            self._annual_daily_prices = self._annual_daily_prices.sort_index(level='Year')
 
         decomp_df = pd.DataFrame(data=self._overall_daily_prices)
 
         # crop dataframe to max 5 last full years
-        decomp_df = decomp_df[self.range_max_yrs.min():pd.to_datetime('today')]
+        decomp_df = decomp_df[self.range_max_yrs.min():pd.Timestamp.today().normalize()]
+
+        # one period is one year of business days
+        period, seasonal = 261, 7
+
+        # fit the smoothings at every day unless in fast mode
+        trend_jump, low_pass_jump = 1, 1
+        if self.fast_stl:
+            # default windows of the STL, rounded up to odd lengths
+            trend = int(np.ceil(1.5 * period / (1 - 1.5 / seasonal)))
+            trend += trend % 2 == 0
+            low_pass = period + 1
+            low_pass += low_pass % 2 == 0
+            # jumps of the fast mode as recommended by Cleveland et al., a tenth of the default trend and low pass windows of statsmodels
+            trend_jump, low_pass_jump = int(np.ceil(0.1 * trend)), int(np.ceil(0.1 * low_pass))
 
         # decompose seasonal trend and residual via LOESS regression
-        decompose_result = STL(decomp_df['Close'], period=365, robust=self.robust, seasonal=7, seasonal_deg=1, trend_deg=1, low_pass_deg=1, seasonal_jump=1, trend_jump=1, low_pass_jump=1).fit()
-        self._overall_daily_seasonal['value'] = decompose_result.seasonal
-        self._overall_daily_trend['value'] = decompose_result.trend
-        self._overall_daily_residual['value'] = decompose_result.resid
+        decompose_result = _stl_decompose_cached(decomp_df['Close'], f'{_DOWNLOADS_DIRNAME}{os.path.sep}{self.symbol}_stl', period=period, robust=self.robust, seasonal=seasonal, seasonal_deg=1, trend_deg=1, low_pass_deg=1, seasonal_jump=1, trend_jump=trend_jump, low_pass_jump=low_pass_jump)
+
+        # all three components are views onto the decomposition result sharing its date index
+        self._overall_daily_seasonal = pd.DataFrame({'value': decompose_result['seasonal']}, copy=False)
+        self._overall_daily_trend = pd.DataFrame({'value': decompose_result['trend']}, copy=False)
+        self._overall_daily_residual = pd.DataFrame({'value': decompose_result['resid']}, copy=False)
+
+    def _get_info(self) -> dict:
+        """Returns the static symbol information, read from today's cache file or downloaded once otherwise."""
+        if self._info is None:
+            if os.path.isfile(self._info_filename):
+                with open(self._info_filename) as f:
+                    self._info = json.load(f)
+            else:
+                try:
+                    # the rate limited session and the ticker are needed for the download only
+                    os.makedirs(_DOWNLOADS_DIRNAME, exist_ok=True)
+                    self._info = dict(_get_ticker(self.symbol, _get_session(self._http_cache_filename)).info)
+                except Exception:
+                    # remember the failure, the download is tried again on the next calc() only
+                    self._info = {}
+                    return self._info
+                with open(self._info_filename, 'w') as f:
+                    json.dump(self._info, f, default=str)
+        return self._info
+
+    def _cached(self, key: str, create) -> pd.DataFrame:
+        """Returns the dataframe of the given key, created by the given function on its first request after calc()."""
+        if key not in self._cache:
+            self._cache[key] = create()
+        return self._cache[key]
 
     def get_symbol_name(self) -> str:
         """Returns the long name of the symbol otherwise the short name otherwise the symbol ticker name."""
-        try:
-            name = self._ticker.info['longName']
-        except KeyError:
-            name = self._ticker.info['shortName']
-        except Exception:
-            name = self.symbol
-        return name
-    
+        info = self._get_info()
+        return info.get('longName') or info.get('shortName') or self.symbol
+
     def get_symbol_currency(self) -> str:
         """Returns the currency of the symbol."""
-        try:
-            currency = self._ticker.info['currency']
-        except Exception:
-            currency = 'currency'
-        return currency
+        return self._get_info().get('currency', 'currency')
 
     def get_overall_daily_prices(self) -> pd.DataFrame:
         """Returns the original dataframe as downloaded from internet."""
@@ -260,29 +391,29 @@ class Model:
     def get_annual_daily_seasonal(self) -> pd.DataFrame:
         """Returns the decomposed annual daily seasonal dataframe in subcycle form."""
         # prepare annual dataframes with multiindex
-        return _df_to_subcycle_form(self._overall_daily_seasonal, self.range_max_yrs)
+        return self._cached('annual_daily_seasonal', lambda: _df_to_subcycle_form(self._overall_daily_seasonal, self.range_max_yrs))
 
     def get_annual_daily_residual(self) -> pd.DataFrame:
         """Returns the decomposed annual daily residual dataframe in subcycle form."""
         # prepare annual dataframes with multiindex
-        return _df_to_subcycle_form(self._overall_daily_residual, self.range_max_yrs)
+        return self._cached('annual_daily_residual', lambda: _df_to_subcycle_form(self._overall_daily_residual, self.range_max_yrs))
 
     def get_monthly_seasonal(self) -> pd.DataFrame:
         """Returns the decomposed annual monthly seasonal dataframe."""
         # prepare annual dataframes with multiindex including the rolling average
-        return _df_to_subcycle_form(self._overall_daily_seasonal.resample('M').mean(), self.range_max_yrs, freq='M', col_name='Month', col_content='%b', with_fill=False, drop_leap=False)
+        return self._cached('monthly_seasonal', lambda: _df_to_subcycle_form(self._overall_daily_seasonal.resample('M').mean(), self.range_max_yrs, freq='M', col_name='Month', col_content='%b', with_fill=False, drop_leap=False))
 
     def get_weekdaily_seasonal(self) -> pd.DataFrame:
         """Returns the decomposed weekdaily seasonal dataframe."""
         # prepare annual dataframes with multiindex including the rolling average
-        return _df_to_subcycle_form(self._overall_daily_seasonal, self.range_max_yrs, freq='B', col_name='Weekday', col_content='%a', with_fill=False, drop_leap=False)
+        return self._cached('weekdaily_seasonal', lambda: _df_to_subcycle_form(self._overall_daily_seasonal, self.range_max_yrs, freq='B', col_name='Weekday', col_content='%a', with_fill=False, drop_leap=False))
 
     def get_annual_quarterly_seasonal(self) -> pd.DataFrame:
         """Returns the decomposed annual quarterly seasonal dataframe."""
         # prepare annual dataframes with multiindex including the rolling average
-        return _df_to_subcycle_form(self._overall_daily_seasonal.resample('Q').mean(), self.range_max_yrs, freq='Q', col_name='Quarter', col_content='%b', with_fill=False, drop_leap=False)
+        return self._cached('annual_quarterly_seasonal', lambda: _df_to_subcycle_form(self._overall_daily_seasonal.resample('Q').mean(), self.range_max_yrs, freq='Q', col_name='Quarter', col_content='%b', with_fill=False, drop_leap=False))
 
     def get_annual_weekly_seasonal(self) -> pd.DataFrame:
         """Returns the decomposed annual weekly seasonal dataframe."""
         # prepare annual dataframes with multiindex including the rolling average
-        return _df_to_subcycle_form(self._overall_daily_seasonal.resample('W').mean(), self.range_max_yrs, freq='W', col_name='Week', col_content='%V', with_fill=False, drop_leap=False)
+        return self._cached('annual_weekly_seasonal', lambda: _df_to_subcycle_form(self._overall_daily_seasonal.resample('W').mean(), self.range_max_yrs, freq='W', col_name='Week', col_content='%V', with_fill=False, drop_leap=False))
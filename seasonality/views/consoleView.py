@@ -10,14 +10,18 @@ class ConsoleView(View):
 
     def render(self) -> None:
         """ Describes the data of the model """
-        print(f'\nOriginal: \n{self._model.get_overall_daily_prices().head()}')
-        print(f'\nTrend: \n{self._model.get_overall_daily_trend().head()}')
-        print(f'\nSeasonal: \n{self._model.get_overall_daily_seasonal().head()}')
-        print(f'\nResidual: \n{self._model.get_overall_daily_residual().head()}')
-        print(f'\nAnnual: \n{self._model.get_annual_daily_prices().head()}')
-        print(f'\nAnnual seasonal: \n{self._model.get_annual_daily_seasonal().head()}')
-        print(f'\nAnnual residual: \n{self._model.get_annual_daily_residual().head()}')
-        print(f'\nMonthly seasonal: \n{self._model.get_monthly_seasonal().head()}')
-        print(f'\nWeekdaily seasonal: \n{self._model.get_weekdaily_seasonal().head()}')
-        print(f'\nQuarterly seasonal: \n{self._model.get_annual_quarterly_seasonal().head()}')
-        print(f'\nWeekly seasonal: \n{self._model.get_annual_weekly_seasonal().head()}')
+        # collect all sections first and write them with a single print
+        sections = [
+            ('Original', self._model.get_overall_daily_prices()),
+            ('Trend', self._model.get_overall_daily_trend()),
+            ('Seasonal', self._model.get_overall_daily_seasonal()),
+            ('Residual', self._model.get_overall_daily_residual()),
+            ('Annual', self._model.get_annual_daily_prices()),
+            ('Annual seasonal', self._model.get_annual_daily_seasonal()),
+            ('Annual residual', self._model.get_annual_daily_residual()),
+            ('Monthly seasonal', self._model.get_monthly_seasonal()),
+            ('Weekdaily seasonal', self._model.get_weekdaily_seasonal()),
+            ('Quarterly seasonal', self._model.get_annual_quarterly_seasonal()),
+            ('Weekly seasonal', self._model.get_annual_weekly_seasonal()),
+        ]
+        print(''.join(f'\n{title}: \n{df.head()}\n' for title, df in sections), end='')
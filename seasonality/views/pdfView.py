@@ -1,8 +1,16 @@
+import calendar
+import colorsys
 import datetime as dt
+from statistics import NormalDist
+from typing import NamedTuple
 
-import matplotlib.pyplot as plt
+import matplotlib
+import matplotlib.cbook as cbook
 import matplotlib.dates as mdates
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
+from matplotlib.offsetbox import AnchoredOffsetbox, TextArea, VPacker
 from matplotlib.backends.backend_pdf import PdfPages
 
 import pandas as pd
@@ -15,11 +23,92 @@ from .view import View
 from ..model import Model
 
 
-def _pdf_layout(figure: plt.Figure) -> None:
+def _pdf_layout(figure: Figure) -> None:
     """ Layouts the figure for PDF export """
     figure.subplots_adjust(top=0.85, bottom=0.15, left=0.1, hspace=0.7, wspace=0.7)
 
 
+def _line_plot(ax: Axes, data: pd.DataFrame) -> None:
+    """ Plots each column of the dataframe as line over its index, labeled by the column names """
+    for column in data.columns:
+        ax.plot(data.index, data[column].to_numpy(), label=column)
+    ax.set_xlabel(data.index.name)
+    ax.legend()
+
+
+def _pdf_title(figure: Figure, lines: list) -> None:
+    """ Adds the centered page title from the given (text, bold) lines, as literal text without mathtext parsing """
+    box = VPacker(
+        children=[TextArea(text, textprops={'fontsize': 20, 'fontweight': 'bold' if bold else 'normal', 'parse_math': False}) for text, bold in lines],
+        align='center', pad=0, sep=4)
+    figure.add_artist(AnchoredOffsetbox(
+        loc='upper center', child=box, pad=0, borderpad=0, frameon=False,
+        bbox_to_anchor=(0.5, 0.98), bbox_transform=figure.transFigure))
+
+
+def _mean_plot(ax: Axes, data: pd.DataFrame, x: str, y: str, conf_band) -> None:
+    """ Plots the mean of y per x, with the confidence band of the mean if conf_band is given as ("ci", <percent>) """
+    grouped = data.groupby(x, sort=True)[y]
+    mean = grouped.mean()
+    ax.plot(mean.index, mean.to_numpy(), label='Daily Mean')
+    if conf_band:
+        # closed form of the interval seaborn would bootstrap, based on the standard error of the mean
+        delta = NormalDist().inv_cdf(0.5 + conf_band[1] / 200) * grouped.sem().to_numpy()
+        ax.fill_between(mean.index, mean.to_numpy() - delta, mean.to_numpy() + delta, alpha=0.2, label=f'{conf_band[1]}% Confidence')
+
+
+def _today_x(today: dt.date) -> int:
+    """ Returns the position of today on the x-axis of the annual daily plots, which has one category per day of a year without Feb. 29th """
+    return today.timetuple().tm_yday - 1 - (calendar.isleap(today.year) and today.month > 2)
+
+
+def _annual_daily_plot(ax: Axes, data: pd.DataFrame, y: str, conf_band, today_x: int, title: str) -> None:
+    """ Plots the daily mean of y over one year with a marker for today and the month names on the x-axis """
+    _mean_plot(ax, data, 'Day', y, conf_band)
+    ax.xaxis.set_major_locator(mdates.MonthLocator())
+    ax.axvline(today_x, ymin=0.05, ymax=0.95, linestyle='dashed', label='today')
+    ax.set_ylabel('USD')
+    ax.set_xlabel('Date')
+    ax.set_title(title)
+    ax.legend()
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b"))
+
+
+def _box_plot(ax: Axes, data: pd.DataFrame, x: str, y: str) -> None:
+    """ Plots the distribution of y per x as boxes in the style of seaborn, categories in order of their first appearance """
+    stats = []
+    for label, values in data.groupby(x, sort=False)[y]:
+        stats.extend(cbook.boxplot_stats(values.dropna().to_numpy(), labels=[label]))
+
+    # filled boxes in the first palette color with gray lines of matching lightness
+    color = sns.color_palette()[0]
+    line_lum = colorsys.rgb_to_hls(*color)[1] * .6
+    line_color = (line_lum, line_lum, line_lum)
+    ax.bxp(
+        stats,
+        widths=0.8,
+        capwidths=0.4,
+        patch_artist=True,
+        boxprops={'facecolor': color, 'edgecolor': line_color},
+        medianprops={'color': line_color, 'solid_capstyle': 'butt'},
+        whiskerprops={'color': line_color, 'solid_capstyle': 'butt'},
+        capprops={'color': line_color},
+        flierprops={'markeredgecolor': line_color, 'markersize': 5},
+    )
+    ax.set_xlabel(x)
+    ax.xaxis.grid(False)
+
+
+class _RenderContext(NamedTuple):
+    """ Values shared by the plots, taken once per render """
+    start: pd.Timestamp     # first day of the overall plots
+    end: pd.Timestamp       # last day of the overall plots
+    all_close: pd.Series    # all closing prices
+    close: pd.Series        # closing prices from start to end
+    currency: str           # currency of the symbol as y-axis label of the overall plots
+    today_x: int            # position of today on the x-axis of the annual daily plots
+
+
 class PdfView(View):
 
     def __init__(
@@ -47,215 +136,150 @@ class PdfView(View):
             raise ValueError('At least one plot must be enabled')
         self._file_path = file_path
         self._ann_conf_band = ann_conf_band
-        self._no_overall_daily_prices_plot = no_overall_daily_prices_plot
-        self._no_overall_daily_trend_plot = no_overall_daily_trend_plot
-        self._no_overall_daily_residual_plot = no_overall_daily_residual_plot
-        self._no_annual_daily_prices_plot = no_annual_daily_prices_plot
-        self._no_annual_daily_seasonal_plot = no_annual_daily_seasonal_plot
-        self._no_annual_daily_redisdual_plot = no_annual_daily_redisdual_plot
-        self._no_annual_weekly_seasonal_plot = no_annual_weekly_seasonal_plot
-        self._no_annual_monthly_seasonal_plot = no_annual_monthly_seasonal_plot
-        self._no_annual_quarterly_seasonal_plot = no_annual_quarterly_seasonal_plot
-        self._no_weekdaily_seasonal_plot = no_weekdaily_seasonal_plot
         self._page_width = page_width
         self._page_height = page_height
 
+        # plan of the enabled plots of the overall page, one per line
+        self._overall_plan = [plot for disabled, plot in (
+            (no_overall_daily_prices_plot, self._plot_overall_daily_prices),
+            (no_overall_daily_trend_plot, self._plot_overall_daily_trend),
+            (no_overall_daily_residual_plot, self._plot_overall_daily_residual),
+        ) if not disabled]
+
+        # plan of the enabled plots of the annual page as lines of (columns, plot, with_context), a single plot of a line spans the full line
+        self._annual_plan = []
+        for line in (
+            ((no_annual_daily_prices_plot, slice(None), self._plot_annual_daily_prices, True),),
+            ((no_annual_daily_seasonal_plot, slice(None), self._plot_annual_daily_seasonal, True),),
+            ((no_annual_daily_redisdual_plot, slice(None), self._plot_annual_daily_residual, True),),
+            ((no_annual_quarterly_seasonal_plot, slice(0, 1), self._plot_annual_quarterly_seasonal, False), (no_annual_monthly_seasonal_plot, slice(1, None), self._plot_annual_monthly_seasonal, False)),
+            ((no_annual_weekly_seasonal_plot, slice(0, -1), self._plot_annual_weekly_seasonal, False), (no_weekdaily_seasonal_plot, slice(-1, None), self._plot_weekdaily_seasonal, False)),
+        ):
+            enabled = [(columns, plot, with_context) for disabled, columns, plot, with_context in line if not disabled]
+            if len(enabled) == 1:
+                enabled = [(slice(None),) + enabled[0][1:]]
+            if enabled:
+                self._annual_plan.append(enabled)
+
+    def _plot_overall_daily_prices(self, ax: Axes, context: _RenderContext) -> None:
+        """ Plots the daily closing prices of last x years with their rolling averages """
+        rolling_narrow_resolution = 50
+        rolling_wide_resolution = 200
+        start, end, all_close = context.start, context.end, context.all_close
+        # roll over the plotted range plus the days needed to fill the widest window only
+        rolling_close = all_close.iloc[max(all_close.index.searchsorted(start) - rolling_wide_resolution + 1, 0):]
+        _line_plot(ax, pd.DataFrame({
+            'Daily closing price': context.close,
+            f'{rolling_wide_resolution} days rolling average': rolling_close.rolling(rolling_wide_resolution).mean()[start:end],
+            f'{rolling_narrow_resolution} days rolling average': rolling_close.rolling(rolling_narrow_resolution).mean()[start:end],
+        }))
+        ax.set_title(f'Daily close prices of last {self._model.range_num_of_years} years')
+        ax.set_ylabel(context.currency)
+
+    def _plot_overall_daily_trend(self, ax: Axes, context: _RenderContext) -> None:
+        """ Plots the daily closing prices of last x years with their STL trend """
+        _line_plot(ax, self._model.get_overall_daily_trend()[context.start:context.end].assign(**{'Daily closing price': context.close}))
+        ax.set_title(f'Fitting of daily closing prices to STL trend of last {self._model.range_num_of_years} years')
+        ax.set_ylabel(context.currency)
+
+    def _plot_overall_daily_residual(self, ax: Axes, context: _RenderContext) -> None:
+        """ Plots the daily residual of the STL trend of last x years """
+        _line_plot(ax, self._model.get_overall_daily_residual())
+        ax.set_title(f'Residual of STL trend of last {self._model.range_num_of_years} years')
+        ax.set_ylabel(context.currency)
+
+    def _plot_annual_daily_prices(self, ax: Axes, context: _RenderContext) -> None:
+        """ Plots the annual daily closing prices with confidence band """
+        _annual_daily_plot(ax, self._model.get_annual_daily_prices(), 'Close', self._ann_conf_band, context.today_x, 'annually closing prices')
+
+    def _plot_annual_daily_seasonal(self, ax: Axes, context: _RenderContext) -> None:
+        """ Plots the annual daily seasonal prices with confidence band """
+        _annual_daily_plot(ax, self._model.get_annual_daily_seasonal(), 'value', self._ann_conf_band, context.today_x, 'annually seasonal price changes')
+
+    def _plot_annual_daily_residual(self, ax: Axes, context: _RenderContext) -> None:
+        """ Plots the annual daily residual prices with confidence band """
+        _annual_daily_plot(ax, self._model.get_annual_daily_residual(), 'value', self._ann_conf_band, context.today_x, 'Annually non-seasonal price changes')
+
+    def _plot_annual_quarterly_seasonal(self, ax: Axes) -> None:
+        """ Plots the annual quarterly seasonal prices """
+        _box_plot(ax, self._model.get_annual_quarterly_seasonal(), 'Quarter', 'value')
+        ax.set_ylabel('USD')
+        ax.set_title('Quarterly')
+
+    def _plot_annual_monthly_seasonal(self, ax: Axes) -> None:
+        """ Plots the annual monthly seasonal prices """
+        _box_plot(ax, self._model.get_monthly_seasonal(), 'Month', 'value')
+        ax.set_ylabel('USD')
+        ax.set_title('Monthly')
+
+    def _plot_annual_weekly_seasonal(self, ax: Axes) -> None:
+        """ Plots the annual weekly seasonal prices """
+        _box_plot(ax, self._model.get_annual_weekly_seasonal(), 'Week', 'value')
+        ax.set_ylabel('USD')
+        ax.set_title('Weekly')
+        ax.tick_params(axis='x', labelsize=4)
+
+    def _plot_weekdaily_seasonal(self, ax: Axes) -> None:
+        """ Plots the weekdaily seasonal prices """
+        _box_plot(ax, self._model.get_weekdaily_seasonal(), 'Weekday', 'value')
+        ax.set_ylabel('USD')
+        ax.set_title('Weekdaily')
+
     def render(self) -> None:
         """ Creates a PDF file with the analysis results """
 
-        # configure progress bar
-        max_progress = 11 - self._no_overall_daily_prices_plot - self._no_overall_daily_trend_plot - self._no_overall_daily_residual_plot - self._no_annual_daily_prices_plot - self._no_annual_daily_seasonal_plot - self._no_annual_daily_redisdual_plot - self._no_annual_weekly_seasonal_plot - self._no_annual_monthly_seasonal_plot - self._no_annual_quarterly_seasonal_plot - self._no_weekdaily_seasonal_plot
-        bar = Bar('Processing', max=max_progress, suffix='%(percent).1f%% - ETA %(eta)ds')
+        # configure progress bar, one step for the setup and one per enabled plot
+        bar = Bar('Processing', max=1 + len(self._overall_plan) + sum(map(len, self._annual_plan)), suffix='%(percent).1f%% - ETA %(eta)ds')
         bar.next()
 
         # Set the figure size to DIN A4 dimensions with a 10mm border
         fig_width = self._page_width + 20  # 10mm border on each side
         fig_height = self._page_height + 20  # 10mm border on each side
 
-        # set number of days for rolling averages for full data plots
-        rolling_narrow_resolution = 50
-        rolling_wide_resolution = 200
-
         # configure graphical apperance of plots
         sns.set_theme(context='paper', font_scale=0.8, rc={'figure.figsize': (fig_width / 25.4, fig_height / 25.4)}, style='darkgrid')
 
-        # get long name of get_symbol_currency()MathText
+        # get long name of the symbol
         symbol_name = self._model.get_symbol_name()
-        symbol_name_mathtext = symbol_name.replace("^", "").replace(" ", "\\ ")
 
-        # Create new PDF file
-        with PdfPages(self._file_path) as pdf:
+        # take today's date once, so the overall plots end and the annual daily plots mark the same day
+        today = pd.Timestamp.today().normalize()
 
-            # first page - plot overall analysis
-            num_subplots = 3 - self._no_overall_daily_prices_plot - self._no_overall_daily_trend_plot - self._no_overall_daily_residual_plot
-            if num_subplots > 0:
-                fig_overall, axs = plt.subplots(num_subplots, 1)
-                _pdf_layout(fig_overall)
-                fig_overall.suptitle(f'Overall analysis of\n$\\bf{{{symbol_name_mathtext}}}$', fontsize=20)
-
-                # if only one subplot, convert to list
-                if num_subplots == 1:
-                    axs = [axs]
-                current_axis = 0
-
-                # Plot overall daily closing prices of last x years
-                if not self._no_overall_daily_prices_plot:
-                    overall_df = pd.DataFrame(data=self._model.get_overall_daily_prices())
-                    overall_df[f'{rolling_wide_resolution} days rolling average'] = overall_df['Close'].rolling(rolling_wide_resolution).mean()
-                    overall_df[f'{rolling_narrow_resolution} days rolling average'] = overall_df['Close'].rolling(rolling_narrow_resolution).mean()
-                    overall_df.rename(columns={'Close': 'Daily closing price'}, inplace=True)
-                    overall_df = overall_df[self._model.range_max_yrs.min():pd.to_datetime('today')]
-                    sns.lineplot(data=overall_df, dashes=False, ax=axs[current_axis], legend='full')
-                    axs[current_axis].set_title(f'Daily close prices of last {self._model.range_num_of_years} years')
-                    axs[current_axis].set_ylabel(self._model.get_symbol_currency())
-                    current_axis += 1
-                    bar.next()
+        # slice the plotted range of the closing prices and look up the currency once for all overall plots,
+        # position today once for all annual daily plots
+        start, end = self._model.range_max_yrs.min(), today
+        all_close = self._model.get_overall_daily_prices()['Close']
+        context = _RenderContext(start, end, all_close, all_close[start:end], self._model.get_symbol_currency(), _today_x(today))
 
-                # Plot overall daily trend of last x years
-                if not self._no_overall_daily_trend_plot:
-                    overall_df = pd.DataFrame(data=self._model.get_overall_daily_trend())
-                    overall_df = overall_df[self._model.range_max_yrs.min():pd.to_datetime('today')]
-                    overall_df['Daily closing price'] = self._model.get_overall_daily_prices()[self._model.range_max_yrs.min():pd.to_datetime('today')]['Close']
-                    sns.lineplot(data=overall_df, dashes=False, ax=axs[current_axis], legend='full')
-                    axs[current_axis].set_title(f'Fitting of daily closing prices to STL trend of last {self._model.range_num_of_years} years')
-                    axs[current_axis].set_ylabel(self._model.get_symbol_currency())
-                    current_axis += 1
-                    bar.next()
+        # Create new PDF file, with full pages and the layout of _pdf_layout even if the rc settings ask for a tight bounding box or a layout engine
+        with matplotlib.rc_context({'savefig.bbox': 'standard', 'figure.autolayout': False, 'figure.constrained_layout.use': False}), PdfPages(self._file_path) as pdf:
 
-                # Plot overall daily residual of last x years
-                if not self._no_overall_daily_residual_plot:
-                    overall_df = pd.DataFrame(data=self._model.get_overall_daily_residual())
-                    sns.lineplot(data=overall_df, dashes=False, ax=axs[current_axis], legend='full')
-                    axs[current_axis].set_title(f'Residual of STL trend of last {self._model.range_num_of_years} years')
-                    axs[current_axis].set_ylabel(self._model.get_symbol_currency())
+            # first page - plot overall analysis
+            if self._overall_plan:
+                fig_overall = Figure()
+                axs = fig_overall.subplots(len(self._overall_plan), 1, squeeze=False)[:, 0]
+                _pdf_layout(fig_overall)
+                _pdf_title(fig_overall, [('Overall analysis of', False), (symbol_name, True)])
+                for ax, plot in zip(axs, self._overall_plan):
+                    plot(ax, context)
                     bar.next()
-
                 pdf.savefig(fig_overall, facecolor='w')
 
             # Second page - plot annual analysis
-            axs = []
-            num_lines = 5 - self._no_annual_daily_prices_plot - self._no_annual_daily_seasonal_plot - self._no_annual_daily_redisdual_plot
-            if self._no_annual_quarterly_seasonal_plot and self._no_annual_monthly_seasonal_plot:
-                num_lines -= 1
-            if self._no_annual_weekly_seasonal_plot and self._no_weekdaily_seasonal_plot:
-                num_lines -= 1
-            num_cols = 3
-
-            if num_lines > 0:
-                fig_annually = plt.figure()
+            if self._annual_plan:
+                fig_annually = Figure()
                 _pdf_layout(fig_annually)
-                gs = GridSpec(num_lines, num_cols, figure=fig_annually)
-                fig_annually.suptitle(f'Annual analysis of\n$\\bf{{{symbol_name_mathtext}}}$\nof last {self._model.range_num_of_years} years\n', fontsize=20)
-
-                current_axis = 0
-
-                # Plot annual daily closing prices with confidence band
-                if not self._no_annual_daily_prices_plot:
-                    axs.append(fig_annually.add_subplot(gs[0, :]))   # add plot over full line
-                    annual_df = self._model.get_annual_daily_prices()
-                    sns.lineplot(data=annual_df, x='Day', y='Close', ax=axs[current_axis], sort=True, errorbar=self._ann_conf_band)
-                    axs[current_axis].xaxis.set_major_locator(mdates.MonthLocator())
-                    axs[current_axis].axvline(f'{"{:02d}".format(dt.date.today().month)}-{"{:02d}".format(dt.date.today().day)}', ymin=0.05, ymax=0.95, linestyle='dashed')
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_xlabel('Date')
-                    axs[current_axis].set_title('annually closing prices')
-                    labels = ['Daily Mean', 'today']
-                    if self._ann_conf_band:
-                        labels.insert(1, '90% Confidence')
-                    axs[current_axis].legend(labels=labels)
-                    axs[current_axis].xaxis.set_major_formatter(mdates.DateFormatter("%b"))
-                    current_axis += 1
-                    bar.next()
-
-                # Plot annual daily seasonal prices with confidence band
-                if not self._no_annual_daily_seasonal_plot:
-                    axs.append(fig_annually.add_subplot(gs[1, :]))   # add plot over full line
-                    annunal_seasonal_decomp_df = self._model.get_annual_daily_seasonal()
-                    sns.lineplot(data=annunal_seasonal_decomp_df, ax=axs[current_axis], x='Day', y='value', errorbar=self._ann_conf_band)
-                    axs[current_axis].xaxis.set_major_locator(mdates.MonthLocator())
-                    axs[current_axis].axvline(f'{"{:02d}".format(dt.date.today().month)}-{"{:02d}".format(dt.date.today().day)}', ymin=0.05, ymax=0.95, linestyle='dashed')
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_xlabel('Date')
-                    axs[current_axis].set_title('annually seasonal price changes')
-                    labels = ['Daily Mean', 'today']
-                    if self._ann_conf_band:
-                        labels.insert(1, '90% Confidence')
-                    axs[current_axis].legend(labels=labels)
-                    axs[current_axis].xaxis.set_major_formatter(mdates.DateFormatter("%b"))
-                    current_axis += 1
-                    bar.next()
-
-                # Plot annual daily residual prices with confidence band
-                if not self._no_annual_daily_redisdual_plot:
-                    axs.append(fig_annually.add_subplot(gs[2, :]))   # add plot over full line
-                    annunal_resid_decomp_df = self._model.get_annual_daily_residual()
-                    sns.lineplot(data=annunal_resid_decomp_df, ax=axs[current_axis], x='Day', y='value', errorbar=self._ann_conf_band)
-                    axs[current_axis].xaxis.set_major_locator(mdates.MonthLocator())
-                    axs[current_axis].axvline(f'{"{:02d}".format(dt.date.today().month)}-{"{:02d}".format(dt.date.today().day)}', ymin=0.05, ymax=0.95, linestyle='dashed')
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_xlabel('Date')
-                    axs[current_axis].set_title('Annually non-seasonal price changes')
-                    labels = ['Daily Mean', 'today']
-                    if self._ann_conf_band:
-                        labels.insert(1, '90% Confidence')
-                    axs[current_axis].legend(labels=labels)
-                    axs[current_axis].xaxis.set_major_formatter(mdates.DateFormatter("%b"))
-                    current_axis += 1
-                    bar.next()
-
-                # Plot annual quarterly seasonal prices
-                if not self._no_annual_quarterly_seasonal_plot:
-                    if self._no_annual_monthly_seasonal_plot:
-                        axs.append(fig_annually.add_subplot(gs[3, :]))
-                    else:
-                        axs.append(fig_annually.add_subplot(gs[3, 0]))
-                    sns.boxplot(data=self._model.get_annual_quarterly_seasonal(), x='Quarter', y='value', ax=axs[current_axis])
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_title('Quarterly')
-                    current_axis += 1
-                    bar.next()
-
-                # Plot annual monthly seasonal prices
-                if not self._no_annual_monthly_seasonal_plot:
-                    if self._no_annual_quarterly_seasonal_plot:
-                        axs.append(fig_annually.add_subplot(gs[3, :]))
-                    else:
-                        axs.append(fig_annually.add_subplot(gs[3, 1:]))
-                    sns.boxplot(data=self._model.get_monthly_seasonal(), x='Month', y='value', ax=axs[current_axis])
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_title('Monthly')
-                    current_axis += 1
-                    bar.next()
-
-                # Plot annual weekly seasonal prices
-                if not self._no_annual_weekly_seasonal_plot:
-                    if self._no_weekdaily_seasonal_plot:
-                        axs.append(fig_annually.add_subplot(gs[4, :]))
-                    else:
-                        axs.append(fig_annually.add_subplot(gs[4, :-1]))
-                    sns.boxplot(data=self._model.get_annual_weekly_seasonal(), x='Week', y='value', ax=axs[current_axis])
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_title('Weekly')
-                    axs[current_axis].tick_params(axis='x', labelsize=4)
-                    current_axis += 1
-                    bar.next()
-
-                # Plot weekdaily seasonal prices
-                if not self._no_weekdaily_seasonal_plot:
-                    if self._no_annual_weekly_seasonal_plot:
-                        axs.append(fig_annually.add_subplot(gs[4, :]))
-                    else:
-                        axs.append(fig_annually.add_subplot(gs[4, 2]))
-                    sns.boxplot(data=self._model.get_weekdaily_seasonal(), x='Weekday', y='value', ax=axs[current_axis])
-                    axs[current_axis].set_ylabel('USD')
-                    axs[current_axis].set_title('Weekdaily')
-                    current_axis += 1
-                    bar.next()
-
+                gs = GridSpec(len(self._annual_plan), 3, figure=fig_annually)
+                _pdf_title(fig_annually, [('Annual analysis of', False), (symbol_name, True), (f'of last {self._model.range_num_of_years} years', False)])
+                for line, plots in enumerate(self._annual_plan):
+                    for columns, plot, with_context in plots:
+                        ax = fig_annually.add_subplot(gs[line, columns])
+                        if with_context:
+                            plot(ax, context)
+                        else:
+                            plot(ax)
+                        bar.next()
                 pdf.savefig(fig_annually, facecolor='w')
 
-        # Close the PDF file
-        plt.close('all')
-
         # Close the progress bar
         bar.finish()